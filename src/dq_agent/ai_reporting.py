@@ -1,15 +1,53 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-from typing import Optional
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from openai import OpenAI
+import pandas as pd
+from openai import AsyncOpenAI, OpenAI, RateLimitError
 
 from .quality import QualityReport
+from .serialization import dumps_json
 from . import settings
 
 
 _client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+
+# LLM에 보내는 카테고리별 최대 행 수 (나머지는 total 건수로만 전달)
+MAX_ROWS_PER_CATEGORY = 20
+
+# 고정 프롬프트는 모듈 상수로 두고 항상 앞에 배치 (리포트 JSON은 맨 뒤에만 붙임)
+# -> 매 호출 프리픽스가 동일해서 프롬프트 캐싱 대상이 됨
+SYSTEM_PROMPT = (
+    "너는 데이터 품질 분석가야. 비개발자도 이해할 수 있게 짧고 명확하게 써. "
+    '정책 예시: "amount 불일치 행은 분석 대상에서 제외한다."'
+)
+
+USER_PROMPT_PREFIX = f"""당신은 데이터 품질 담당자입니다. 아래 JSON(하루치 CSV 품질 점검 결과)을 보고 실무에 바로 적용할 데이터 처리 정책을 작성하세요.
+
+품질 신호는 4가지만 다룹니다:
+1) 결측(missing)
+2) 중복(duplicates)
+3) 이상치(outlier, IQR)
+4) 비즈니스 룰 위반(business_rule): 0/음수 값, amount != quantity * unit_price, 날짜 형식 오류(invalid_date_format), 기준일 불일치(non_base_date)
+
+규칙: 모든 문장은 "~한다/~제외한다/~분리한다" 같은 결정형으로 쓰고 조언형 표현은 쓰지 않는다. JSON에 없는 비즈니스 의미(환불·취소 등)는 단정하지 않고, 0/음수 값은 "정상 데이터에서 제외한다" 또는 "별도 검토 대상으로 분리한다"처럼 중립적으로 표현한다.
+
+출력은 아래 두 섹션만:
+## 요약 - 3~5줄, 전체 상태와 핵심 리스크를 건수/비율과 함께
+## 권장 데이터 처리 정책 - 5~8개 bullet, 각 bullet은 정책 문장 하나
+
+row_issues는 카테고리별 total 건수와 sample(최대 {MAX_ROWS_PER_CATEGORY}건)만 제공됩니다. sample은 "fields:" 헤더 뒤 파이프(|) 구분 행이며, 목록 값은 ",", 빈 칸은 결측입니다.
+
+```json
+"""
 
 
 def get_client() -> OpenAI:
@@ -17,14 +55,207 @@ def get_client() -> OpenAI:
     if _client is not None:
         return _client
 
-    if not settings.OPENAI_API_KEY:
+    api_key = settings.get_openai_api_key()
+    if not api_key:
         raise RuntimeError("OPENAI_API_KEY가 설정되어 있지 않습니다.")
 
-    _client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    _client = OpenAI(api_key=api_key)
     return _client
 
 
-def generate_ai_summary(report: QualityReport) -> str:
+def get_async_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+
+    api_key = settings.get_openai_api_key()
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY가 설정되어 있지 않습니다.")
+
+    _async_client = AsyncOpenAI(api_key=api_key)
+    return _async_client
+
+
+def _format_onto_value(value: Any) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return ",".join(str(x) for x in value)
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value).replace("|", "/")
+
+
+def _rows_to_onto(rows: List[Dict[str, Any]], fields: List[str]) -> str:
+    """
+    row_issues rows(list[dict]) -> 헤더 1줄 + 파이프(|) 구분 행
+    예) "fields: row_index|order_id|issues\n3|1004|invalid_date_format"
+    - 필드명은 헤더에 한 번만 쓰고, 행에는 값만 나열
+    - 리스트 값(issues, missing_columns)은 ","로 연결, 결측은 빈 칸
+    """
+    if not rows:
+        return ""
+
+    lines = ["fields: " + "|".join(fields)]
+    for r in rows:
+        lines.append("|".join(_format_onto_value(r.get(f)) for f in fields))
+    return "\n".join(lines)
+
+
+def _onto_fields(rows: List[Dict[str, Any]]) -> List[str]:
+    """rows에 등장하는 키를 처음 나온 순서대로 반환 (row_index 우선)."""
+    fields: List[str] = ["row_index"]
+    for r in rows:
+        for k in r.keys():
+            if k not in fields:
+                fields.append(k)
+    return fields
+
+
+def _sample_rows(category: str, rows: pd.DataFrame) -> pd.DataFrame:
+    """
+    카테고리별로 최대 MAX_ROWS_PER_CATEGORY건만 남긴다 (DataFrame에서 먼저 고르고 dict 변환은 호출 측에서).
+    - business_rule은 issues[0] 기준으로 층화해서 모든 위반 유형이 최소 1건은 포함되게 함
+    """
+    if len(rows) <= MAX_ROWS_PER_CATEGORY:
+        return rows
+    if category != "business_rule" or "issues" not in rows.columns:
+        return rows.head(MAX_ROWS_PER_CATEGORY)
+
+    # 위반 유형(issues[0])별 첫 행의 위치, 유형 이름순
+    first_issue = rows["issues"].str[0].fillna("").astype(str).reset_index(drop=True)
+    firsts = first_issue.drop_duplicates().sort_values(kind="stable")
+    picked = firsts.index[:MAX_ROWS_PER_CATEGORY].tolist()
+
+    seen = set(picked)
+    for i in range(len(rows)):
+        if len(picked) >= MAX_ROWS_PER_CATEGORY:
+            break
+        if i not in seen:
+            picked.append(i)
+
+    return rows.iloc[sorted(picked)]
+
+
+# 파일 없음 / 이슈 0건인 날은 LLM 없이 고정 문구 사용
+NO_FILE_SUMMARY = """## 요약
+- 점검 대상 파일이 없거나 읽을 수 없어 품질 점검을 수행하지 않았다.
+
+## 권장 데이터 처리 정책
+- 해당 일자 데이터는 파일이 적재될 때까지 분석 대상에서 제외한다."""
+
+CLEAN_SUMMARY = """## 요약
+- 결측 0건, 중복 0건, 이상치 0건, 룰 위반 0건으로 품질 이슈가 없다.
+
+## 권장 데이터 처리 정책
+- 해당 일자 데이터는 별도 전처리 없이 분석 대상에 포함한다."""
+
+
+def _is_trivial(report: QualityReport) -> bool:
+    """파일이 없거나, 결측/이상치/행 단위 이슈가 모두 0건이면 True."""
+    if not report.has_file:
+        return True
+    if report.missing is not None and sum(report.missing.missing_by_column.values()) > 0:
+        return False
+    if report.outlier is not None and sum(report.outlier.outlier_count_by_column.values()) > 0:
+        return False
+    return all(len(rows) == 0 for rows in (report.row_issues or {}).values())
+
+
+def _trivial_summary(report: QualityReport) -> Optional[str]:
+    if not _is_trivial(report):
+        return None
+    return CLEAN_SUMMARY if report.has_file else NO_FILE_SUMMARY
+
+
+def _cache_path(prompt: str) -> Path:
+    """모델 + 프롬프트 전체의 SHA-256을 키로 하는 캐시 파일 경로."""
+    key = hashlib.sha256(f"{settings.OPENAI_MODEL}\n{prompt}".encode("utf-8")).hexdigest()
+    return settings.REPORT_DIR / settings.AI_CACHE_DIR_NAME / f"{key}.md"
+
+
+def _build_prompt(report: QualityReport) -> str:
+    """리포트 -> LLM user 프롬프트 (동기/배치 호출이 같은 프롬프트를 쓰도록 분리)."""
+    # row_issues는 DataFrame에서 샘플만 골라 그 행만 dict로 변환
+    report_dict = report.to_dict(include_rows=False)
+    if report.row_issues is not None:
+        row_issues = {}
+        for k, rows in report.row_issues.items():
+            sample = _sample_rows(k, rows).to_dict(orient="records")
+            row_issues[k] = {
+                "total": len(rows),
+                "sample": _rows_to_onto(sample, _onto_fields(sample)),
+            }
+        report_dict["row_issues"] = row_issues
+    report_json = dumps_json(report_dict).decode("utf-8")
+
+    return USER_PROMPT_PREFIX + report_json + "\n```"
+
+
+def _build_messages(prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _read_cache(cache_path: Optional[Path]) -> Optional[str]:
+    """캐시된 요약 (없으면 None). 읽은 항목은 mtime을 갱신해서 최근 사용 순서를 유지."""
+    if cache_path is None:
+        return None
+    try:
+        summary = cache_path.read_text(encoding="utf-8")
+        os.utime(cache_path)
+    except FileNotFoundError:
+        return None
+    return summary
+
+
+def _write_cache(cache_path: Optional[Path], summary: str) -> None:
+    if cache_path is not None and summary:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(summary, encoding="utf-8")
+        _evict_cache(cache_path.parent)
+
+
+def _evict_cache(cache_dir: Path) -> None:
+    """캐시 항목이 settings.AI_CACHE_MAX_ENTRIES를 넘으면 가장 오래 사용하지 않은 것부터 삭제 (LRU)."""
+    entries = list(cache_dir.glob("*.md"))
+    excess = len(entries) - settings.AI_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return
+
+    def last_used(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    entries.sort(key=last_used)
+    for path in entries[:excess]:
+        path.unlink(missing_ok=True)
+
+
+def _precomputed_summary(
+    report: QualityReport,
+) -> Tuple[Optional[str], Optional[str], Optional[Path]]:
+    """
+    API 호출 없이 정해지는 요약 확인 (동기/비동기/배치 공통)
+    - 이상 없음/파일 없음이면 (고정 문구, None, None)
+    - 아니면 (캐시된 요약 또는 None, 프롬프트, 캐시 경로)
+      같은 리포트(재실행/재시도)면 캐시된 요약을 재사용
+    """
+    trivial = _trivial_summary(report)
+    if trivial is not None:
+        return trivial, None, None
+
+    prompt = _build_prompt(report)
+    cache_path = _cache_path(prompt) if settings.ENABLE_AI_CACHE else None
+    return _read_cache(cache_path), prompt, cache_path
+
+
+def generate_ai_summary(
+    report: QualityReport,
+    write_cb: Optional[Callable[[str], Any]] = None,
+) -> str:
     """
     ✅ '요약' + '권장 액션'만 출력 (짧고 명확)
     ✅ 검사 범위는 4개만:
@@ -32,72 +263,159 @@ def generate_ai_summary(report: QualityReport) -> str:
     - 중복
     - 이상치(IQR)
     - 비즈니스 룰 위반(0/음수, 금액 불일치, 날짜 문제 포함)
+
+    stream=True로 받아서, write_cb가 주어지면 토큰이 도착하는 대로 넘겨준다
+    (예: 열려 있는 .md 파일의 write).
     """
+    summary, prompt, cache_path = _precomputed_summary(report)
+    if summary is not None:
+        if write_cb is not None:
+            write_cb(summary)
+        return summary
+
     client = get_client()
-    report_dict = report.to_dict()
-    report_json = json.dumps(report_dict, ensure_ascii=False, indent=2)
+    response = client.chat.completions.create(
+        model=settings.OPENAI_MODEL,
+        messages=_build_messages(prompt),
+        temperature=0.2,
+        stream=True,
+    )
 
-    prompt = f"""
-당신은 데이터 품질(Data Quality) 담당자입니다.
-아래 JSON은 하루치 CSV 데이터에 대한 품질 점검 결과입니다.
+    parts: List[str] = []
+    # 뒤쪽 공백은 다음 조각이 올 때까지 보류 -> 마지막 공백은 버려져 strip()한 요약(캐시)과 같은 내용이 기록됨
+    pending_ws = ""
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        if not parts:
+            # 앞쪽 공백은 버림 (기존 strip()과 동일한 결과)
+            delta = delta.lstrip()
+            if not delta:
+                continue
+        parts.append(delta)
+        if write_cb is not None:
+            text = pending_ws + delta
+            body = text.rstrip()
+            pending_ws = text[len(body):]
+            if body:
+                write_cb(body)
 
-이 리포트의 목적은 "조언"이 아니라,
-실무에서 바로 적용할 수 있는 **데이터 처리 정책**을 제시하는 것입니다.
+    summary = "".join(parts).strip()
 
-이 프로젝트는 아래 4가지 품질 신호만 다룹니다:
-1) 결측(missing)
-2) 중복(duplicates)
-3) 이상치(outlier, IQR)
-4) 비즈니스 룰 위반(business_rule)
-   - 0/음수 값
-   - amount 불일치(amount != quantity * unit_price)
-   - 날짜 형식 오류(invalid_date_format)
-   - 기준일 불일치(non_base_date)
-
-⚠️ 매우 중요한 작성 규칙:
-- "검토하세요", "고려하세요", "강화하세요" 같은 **조언형 표현을 사용하지 마세요**.
-- 각 항목은 반드시 **명확한 처리 기준(정책)** 형태로 작성하세요.
-- 문장은 "~한다", "~제외한다", "~분리한다"처럼 **결정형**으로 끝나야 합니다.
-- 실제 운영·분석 단계에서 바로 실행 가능한 행동만 작성하세요.
-- JSON에 명시적으로 존재하지 않는 비즈니스 의미(예: 환불, 취소)는 절대 단정하지 마세요.
-- 0 또는 음수 값은 의미 해석을 하지 말고,
-  "정상 데이터에서 제외한다" 또는 "별도 검토 대상으로 분리한다"처럼 중립적으로 표현하세요.
-- '환불', '취소'라는 단어는 JSON에 해당 컬럼이나 플래그가 없는 한 사용하지 마세요.
-
-출력 형식은 반드시 아래 두 섹션만 포함해야 합니다.
-
-## 요약
-- 3~5줄
-- 전체 데이터 품질 상태와 가장 중요한 리스크를 요약
-- 수치(건수/비율)를 반드시 포함
+    _write_cache(cache_path, summary)
 
-## 권장 데이터 처리 정책
-- 5~8개의 bullet point
-- 각 bullet은 하나의 **명확한 정책 문장**
-- 조언형 표현 금지
-- 비즈니스 의미를 단정하지 말 것
+    return summary
 
-예시(형식 참고용, 의미 단정 금지):
-- "amount 불일치 행은 분석 대상에서 제외한다."
-- "0 또는 음수 수량, 단가, 금액 행은 정상 주문 데이터로 간주하지 않는다."
-- "날짜 형식 오류 행은 분석 대상에서 제외한다."
 
-아래는 품질 점검 결과 JSON입니다:
+async def generate_ai_summary_async(report: QualityReport, max_retries: int = 5) -> str:
+    """
+    generate_ai_summary의 비동기 버전 (여러 날짜를 동시에 요청할 때 사용)
+    - 429(RateLimitError)는 지수 백오프로 최대 max_retries번까지 시도
+    """
+    if max_retries < 1:
+        raise ValueError("max_retries는 1 이상이어야 합니다.")
+
+    summary, prompt, cache_path = _precomputed_summary(report)
+    if summary is not None:
+        return summary
+
+    client = get_async_client()
+    for attempt in range(max_retries):
+        try:
+            response = await client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=_build_messages(prompt),
+                temperature=0.2,
+            )
+            break
+        except RateLimitError:
+            if attempt == max_retries - 1:
+                raise
+            await asyncio.sleep(2 ** attempt)
 
-```json
-{report_json}
-```
-"""
-    response = client.chat.completions.create(
-    model=settings.OPENAI_MODEL,
-    messages=[
-    {"role": "system", "content": "너는 데이터 품질 분석가야. 비개발자도 이해할 수 있게 짧고 명확하게 써."},
-    {"role": "user", "content": prompt},
-    ],
-    temperature=0.2,
-    )
     content = response.choices[0].message.content
-    return content.strip() if content else ""
+    summary = content.strip() if content else ""
+
+    _write_cache(cache_path, summary)
+
+    return summary
+
+
+def generate_ai_summaries_batch(
+    items: List[Tuple[datetime, QualityReport]],
+    poll_interval: float = 30.0,
+) -> Dict[datetime, str]:
+    """
+    여러 날짜의 AI 요약을 OpenAI Batch API로 한 번에 생성 (백필용)
+    - 동기 호출 대비 비용 50%, 별도 rate limit
+    - 캐시에 있는 날짜는 제외하고 나머지만 JSONL로 제출
+    - 완료될 때까지 poll_interval초 간격으로 상태 확인
+    """
+    summaries: Dict[datetime, str] = {}
+    pending: Dict[str, Tuple[datetime, Optional[Path]]] = {}
+    lines: List[str] = []
+
+    for dt, report in items:
+        summary, prompt, cache_path = _precomputed_summary(report)
+        if summary is not None:
+            summaries[dt] = summary
+            continue
+
+        custom_id = dt.isoformat()
+        pending[custom_id] = (dt, cache_path)
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": settings.OPENAI_MODEL,
+                "messages": _build_messages(prompt),
+                "temperature": 0.2,
+            },
+        }, ensure_ascii=False))
+
+    if not lines:
+        return summaries
+
+    client = get_client()
+    batch_file = client.files.create(
+        file=("dq_agent_batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"배치 작업이 완료되지 않았습니다: {batch.id} ({batch.status})")
+
+    output = client.files.content(batch.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        custom_id = result.get("custom_id")
+        if custom_id not in pending:
+            continue
+
+        body = (result.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or []
+        if not choices:
+            continue
+
+        content = choices[0].get("message", {}).get("content")
+        summary = content.strip() if content else ""
+        dt, cache_path = pending[custom_id]
+        summaries[dt] = summary
+        _write_cache(cache_path, summary)
 
-  
-  
\ No newline at end of file
+    return summaries
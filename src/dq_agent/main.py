@@ -1,67 +1,195 @@
 # src/dq_agent/main.py
 from __future__ import annotations
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, NoReturn, Tuple
 
+import asyncio
 import sys
+import textwrap
+import numpy as np
 import pandas as pd
 
 from . import settings
 from .quality import QualityReport, run_quality_checks
-from .reporting import save_json_report, save_markdown_report, save_html_from_md
+from .reporting import save_all_reports
 
+try:
+    from .ai_reporting import generate_ai_summaries_batch, generate_ai_summary_async
+except ImportError:
+    # AI 리포트 생성 기능이 없는 경우
+    generate_ai_summaries_batch = None
+    generate_ai_summary_async = None
 
-def run_for_date(dt: datetime | None = None) -> QualityReport:
-    if dt is None:
-        dt = datetime.today()
 
+def read_csv(file_path: Path) -> pd.DataFrame:
+    """
+    CSV 로드
+    - pyarrow 엔진(멀티스레드 파서)을 우선 사용
+    - pyarrow가 없거나 파일/옵션을 지원하지 않으면 기본 엔진으로 재시도
+    """
+    # 날짜 컬럼은 기본 엔진처럼 문자열로 읽음 (pyarrow는 깨끗한 날짜 컬럼을 date32로 추론)
+    # str로 지정하면 빈 칸이 "None" 문자열이 되므로 "string"으로 읽고 object로 되돌림
+    dtype = {c: "string" for c in settings.DATETIME_COLUMNS}
+    try:
+        df = pd.read_csv(file_path, engine="pyarrow", dtype=dtype)
+    except (ImportError, ValueError):
+        return pd.read_csv(file_path)
+
+    for c in settings.DATETIME_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype(object)
+
+    # pyarrow는 문자열 컬럼의 빈 칸을 None/NA로 읽음 -> 기본 엔진과 같게 NaN으로 통일
+    obj_cols = df.columns[df.dtypes == object]
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].notna(), np.nan)
+    return df
+
+
+def build_report(dt: datetime) -> QualityReport:
+    """파일 로드 + 품질 점검 (저장은 하지 않음)."""
     file_path = settings.get_today_file_path(dt)
     if not file_path.exists():
         # 파일이 없는 경우
-        report = QualityReport(
+        return QualityReport(
             has_file=False,
             message=f"오늘 날짜에 해당하는 파일이 존재하지 않습니다: {file_path.name}",
         )
-        save_json_report(report, dt=dt)
-        save_markdown_report(report, dt=dt)
-        return report
 
     # 파일 로드
     try:
-        df = pd.read_csv(file_path)
+        df = read_csv(file_path)
     except Exception as e:
-        report = QualityReport(
+        return QualityReport(
             has_file=False,
             message=f"파일을 읽는 도중 오류 발생: {e}",
         )
-        save_json_report(report, dt=dt)
-        save_markdown_report(report, dt=dt)
-        return report
 
     # 품질 점검 실행 👉 날짜 정보 함께 전달
-    report = run_quality_checks(df, dt=dt)
+    return run_quality_checks(df, dt=dt)
+
+
+def run_for_date(dt: datetime | None = None) -> QualityReport:
+    if dt is None:
+        dt = datetime.today()
+
+    report = build_report(dt)
+    # 결과 저장 (JSON + Markdown + HTML)
+    save_all_reports(report, dt=dt)
+    return report
+
 
-    # 결과 저장 (JSON + Markdown)
-    save_json_report(report, dt=dt)
-    md_path = save_markdown_report(report, dt=dt)
+def _date_range(start: datetime, end: datetime) -> List[datetime]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
 
-    # Markdown -> HTML 변환 추가
-    html_path = md_path.with_suffix(".html")
-    save_html_from_md(md_path, html_path)
+
+def _ai_enabled() -> bool:
+    return bool(settings.ENABLE_AI_REPORT and settings.get_openai_api_key())
+
+
+async def _run_one_async(dt: datetime, semaphore: asyncio.Semaphore) -> QualityReport:
+    # CSV 로드/점검은 동기 코드라 스레드로 넘겨 다른 날짜의 API 대기와 겹치게 함
+    report = await asyncio.to_thread(build_report, dt)
+
+    ai_summary = None
+    ai_error = None
+    if _ai_enabled() and generate_ai_summary_async is not None:
+        async with semaphore:
+            try:
+                ai_summary = await generate_ai_summary_async(report)
+            except Exception as e:
+                # 실패한 날짜는 실패 문구만 기록 (동기 호출로 다시 시도하면 동시성 상한을 벗어남)
+                print(f"[AI 요약 실패] {dt:%Y-%m-%d}: {e}", file=sys.stderr)
+                ai_error = str(e)
+
+    await asyncio.to_thread(save_all_reports, report, dt, ai_summary, ai_error)
     return report
 
 
+async def _run_for_dates_async(dts: List[datetime]) -> List[QualityReport]:
+    semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+    return await asyncio.gather(*(_run_one_async(dt, semaphore) for dt in dts))
+
+
+def run_for_dates(dts: List[datetime]) -> List[QualityReport]:
+    """
+    여러 날짜를 동시에 실행
+    - AI 요청은 AsyncOpenAI로 최대 settings.AI_MAX_CONCURRENCY개까지 동시에 보냄
+    """
+    return list(asyncio.run(_run_for_dates_async(dts)))
+
+
+def run_for_dates_batch(start: datetime, end: datetime) -> List[QualityReport]:
+    """
+    기간(start~end, 양 끝 포함) 백필
+    - 품질 점검은 날짜별로 바로 수행
+    - AI 요약은 OpenAI Batch API로 한 번에 제출 (동기 호출 대비 비용 50%)
+    """
+    items = [(dt, build_report(dt)) for dt in _date_range(start, end)]
+
+    summaries = {}
+    if _ai_enabled() and generate_ai_summaries_batch is not None:
+        try:
+            summaries = generate_ai_summaries_batch(items)
+        except Exception as e:
+            # 배치 실패 시 날짜별 동기 호출로 대체
+            print(f"[AI 배치 요약 실패] {e}", file=sys.stderr)
+
+    for dt, report in items:
+        save_all_reports(report, dt=dt, ai_summary=summaries.get(dt))
+    return [report for _, report in items]
+
+
+def _usage_error(message: str) -> NoReturn:
+    print(f"오류: {message}", file=sys.stderr)
+    print(textwrap.dedent(main.__doc__).strip(), file=sys.stderr)
+    sys.exit(2)
+
+
+def _parse_args(argv: List[str]) -> Tuple[bool, List[datetime]]:
+    """
+    argv -> (--batch 여부, 날짜 목록 0~2개)
+    - 잘못된 인자(날짜 형식, 개수, 종료일 < 시작일)는 사용법을 출력하고 종료
+    """
+    batch = bool(argv) and argv[0] == "--batch"
+    args = argv[1:] if batch else argv
+    if batch and not args:
+        _usage_error("--batch에는 시작일이 필요합니다.")
+    if len(args) > 2:
+        _usage_error("날짜는 최대 2개(시작일, 종료일)까지 지정할 수 있습니다.")
+
+    try:
+        dates = [datetime.strptime(a, "%Y-%m-%d") for a in args]
+    except ValueError:
+        _usage_error("날짜는 YYYY-MM-DD 형식이어야 합니다.")
+
+    if len(dates) == 2 and dates[1] < dates[0]:
+        _usage_error("종료일이 시작일보다 빠릅니다.")
+    return batch, dates
+
+
 def main():
     """
     사용법:
-      python -m dq_agent.main              # 오늘 날짜 기준
-      python -m dq_agent.main 2025-10-31   # 특정 날짜 지정 (옵션)
+      python -m dq_agent.main                                  # 오늘 날짜 기준
+      python -m dq_agent.main 2025-10-31                       # 특정 날짜 지정 (옵션)
+      python -m dq_agent.main 2025-10-01 2025-10-31            # 기간 실행 (AI 요약 동시 요청)
+      python -m dq_agent.main --batch 2025-10-01 2025-10-31    # 기간 백필 (AI 요약은 Batch API)
     """
-    if len(sys.argv) > 1:
-        date_str = sys.argv[1]
-        dt = datetime.strptime(date_str, "%Y-%m-%d")
-    else:
-        dt = datetime.today()
+    batch, dates = _parse_args(sys.argv[1:])
+
+    if batch:
+        for report in run_for_dates_batch(dates[0], dates[-1]):
+            print(report.to_dict())
+        return
+
+    if len(dates) == 2:
+        for report in run_for_dates(_date_range(*dates)):
+            print(report.to_dict())
+        return
 
+    dt = dates[0] if dates else datetime.today()
     report = run_for_date(dt)
     print(report.to_dict())
 
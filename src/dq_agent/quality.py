@@ -3,6 +3,7 @@ from dataclasses import dataclass, asdict
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 from . import settings
 
@@ -35,9 +36,10 @@ class QualityReport:
     message: str
     missing: MissingSummary | None = None
     outlier: OutlierSummary | None = None
-    row_issues: Dict[str, List[Dict[str, Any]]] | None = None
+    row_issues: Dict[str, pd.DataFrame] | None = None
 
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, include_rows: bool = True) -> Dict[str, Any]:
+        """include_rows=False면 row_issues(행 단위 dict 변환)를 생략."""
         result: Dict[str, Any] = {
             "has_file": self.has_file,
             "message": self.message,
@@ -46,11 +48,66 @@ class QualityReport:
             result["missing"] = asdict(self.missing)
         if self.outlier:
             result["outlier"] = asdict(self.outlier)
-        if self.row_issues is not None:
-            result["row_issues"] = self.row_issues
+        if include_rows and self.row_issues is not None:
+            # 검사별 DataFrame -> row dict 목록 (JSON/AI 리포트용, 여기서만 변환)
+            result["row_issues"] = {
+                k: rows.to_dict(orient="records")
+                for k, rows in self.row_issues.items()
+            }
         return result
 
 
+# ======================
+#  Column coercion (숫자/날짜 변환은 한 번만 하고 검사 간 공유)
+# ======================
+
+def _parse_datetime(series: pd.Series) -> pd.Series:
+    """
+    날짜 컬럼 파싱 (실패 시 NaT).
+    - settings.DATE_FORMAT으로 고정 파싱 (포맷 추론 없이 빠른 경로)
+    - 절반 이상 실패하면 ISO8601로 한 번 더 시도
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        series = series.astype(str)
+
+    parsed = pd.to_datetime(series, errors="coerce", format=settings.DATE_FORMAT)
+    if parsed.isna().mean() > 0.5:
+        retry = pd.to_datetime(series, errors="coerce", format="ISO8601")
+        if retry.notna().sum() > parsed.notna().sum():
+            parsed = retry
+    return parsed
+
+
+def _numeric_column(
+    df: pd.DataFrame,
+    col: str,
+    numeric_cache: Optional[Dict[str, pd.Series]] = None,
+) -> pd.Series:
+    """숫자 변환된 컬럼 (컬럼이 없으면 전부 NaN, 원본 인덱스 유지)."""
+    if numeric_cache is not None and col in numeric_cache:
+        return numeric_cache[col]
+    if col not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype="float64")
+    return pd.to_numeric(df[col], errors="coerce")
+
+
+def _datetime_column(
+    df: pd.DataFrame,
+    col: str,
+    datetime_cache: Optional[Dict[str, pd.Series]] = None,
+) -> pd.Series:
+    """파싱된 날짜 컬럼 (컬럼이 존재할 때만 호출)."""
+    if datetime_cache is not None and col in datetime_cache:
+        return datetime_cache[col]
+    return _parse_datetime(df[col])
+
+
+def _valid_values(series: pd.Series) -> np.ndarray:
+    """숫자 컬럼 -> NaN을 뺀 float ndarray."""
+    arr = series.to_numpy(dtype="float64", na_value=np.nan)
+    return arr[~np.isnan(arr)]
+
+
 def check_missing(df: pd.DataFrame) -> MissingSummary:
     total_rows = len(df)
     total_columns = df.shape[1]
@@ -67,7 +124,10 @@ def check_missing(df: pd.DataFrame) -> MissingSummary:
     )
 
 
-def check_outliers_iqr(df: pd.DataFrame) -> OutlierSummary:
+def check_outliers_iqr(
+    df: pd.DataFrame,
+    numeric_cache: Optional[Dict[str, pd.Series]] = None,
+) -> OutlierSummary:
     outlier_counts: Dict[str, int] = {}
 
     for col in settings.NUMERIC_COLUMNS:
@@ -75,21 +135,20 @@ def check_outliers_iqr(df: pd.DataFrame) -> OutlierSummary:
             outlier_counts[col] = 0
             continue
 
-        series = pd.to_numeric(df[col], errors="coerce").dropna()
-        if series.empty:
+        arr = _valid_values(_numeric_column(df, col, numeric_cache))
+        if arr.size == 0:
             outlier_counts[col] = 0
             continue
 
-        q1 = series.quantile(0.25)
-        q3 = series.quantile(0.75)
+        # 정렬 한 번으로 q1/q3 동시 계산
+        q1, q3 = np.quantile(arr, [0.25, 0.75])
         iqr = q3 - q1
         k = settings.OUTLIER_IQR_MULTIPLIER
 
         lower = q1 - k * iqr
         upper = q3 + k * iqr
 
-        is_outlier = (series < lower) | (series > upper)
-        outlier_counts[col] = int(is_outlier.sum())
+        outlier_counts[col] = int(((arr < lower) | (arr > upper)).sum())
 
     return OutlierSummary(
         method="iqr",
@@ -100,59 +159,63 @@ def check_outliers_iqr(df: pd.DataFrame) -> OutlierSummary:
 
 # ======================
 #  Row-level issue collectors (4개 검사)
+#  - 결과는 검사별 DataFrame(원본 컬럼 + row_index + 메타 컬럼)으로 유지하고
+#    dict 변환은 QualityReport.to_dict()에서 한 번만 수행
 # ======================
 
-def collect_missing_rows(df: pd.DataFrame) -> List[Dict[str, Any]]:
-    """결측값이 포함된 행 전체를 row 단위로 반환."""
+def _issue_frame(sub: pd.DataFrame, **meta: List[Any]) -> pd.DataFrame:
+    """위반 행 DataFrame에 row_index와 메타 컬럼(issues/missing_columns)을 붙인다."""
+    out = sub.copy()
+    out["row_index"] = sub.index
+    for name, values in meta.items():
+        out[name] = pd.Series(values, index=sub.index, dtype=object)
+    return out
+
+
+def collect_missing_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """결측값이 포함된 행 전체를 반환 (missing_columns: 결측 컬럼 목록)."""
     mask = df.isna()
     has_missing = mask.any(axis=1)
 
-    rows: List[Dict[str, Any]] = []
-    for idx in df.index[has_missing]:
-        row = df.loc[idx]
-        missing_cols = mask.loc[idx][mask.loc[idx]].index.tolist()
-        row_dict = row.to_dict()
-        row_dict["row_index"] = int(idx) if isinstance(idx, int) else idx
-        row_dict["missing_columns"] = missing_cols
-        rows.append(row_dict)
-    return rows
+    sub_mask = mask[has_missing].to_numpy()
+    cols = np.array(df.columns, dtype=object)
 
+    return _issue_frame(
+        df[has_missing],
+        missing_columns=[cols[row_mask].tolist() for row_mask in sub_mask],
+    )
 
-def collect_duplicate_rows(df: pd.DataFrame) -> List[Dict[str, Any]]:
+
+def collect_duplicate_rows(df: pd.DataFrame) -> pd.DataFrame:
     """order_id 기준 중복 행을 모두 반환."""
     if "order_id" not in df.columns:
-        return []
+        return _issue_frame(df.iloc[0:0])
 
     dup_mask = df.duplicated(subset=["order_id"], keep=False)
-    dup_df = df[dup_mask]
-
-    rows: List[Dict[str, Any]] = []
-    for idx, row in dup_df.iterrows():
-        row_dict = row.to_dict()
-        row_dict["row_index"] = int(idx) if isinstance(idx, int) else idx
-        rows.append(row_dict)
-    return rows
+    return _issue_frame(df[dup_mask])
 
-def collect_outlier_rows_iqr(df: pd.DataFrame) -> List[Dict[str, Any]]:
+def collect_outlier_rows_iqr(
+    df: pd.DataFrame,
+    numeric_cache: Optional[Dict[str, pd.Series]] = None,
+) -> pd.DataFrame:
     """
     IQR 기준으로 이상치인 '행'을 수집해서 반환.
     - 여러 컬럼에서 이상치인 경우 issues에 누적: ["outlier:quantity", "outlier:amount"]
     - settings.NUMERIC_COLUMNS 기준으로 탐지
     """
-    rows_by_index: Dict[Any, Dict[str, Any]] = {}
+    issues_by_index: Dict[Any, List[str]] = {}
 
     for col in settings.NUMERIC_COLUMNS:
         if col not in df.columns:
             continue
 
         # 숫자 변환 (원본 인덱스 유지)
-        s = pd.to_numeric(df[col], errors="coerce")
-        valid = s.dropna()
-        if valid.empty:
+        s = _numeric_column(df, col, numeric_cache)
+        valid = _valid_values(s)
+        if valid.size == 0:
             continue
 
-        q1 = valid.quantile(0.25)
-        q3 = valid.quantile(0.75)
+        q1, q3 = np.quantile(valid, [0.25, 0.75])
         iqr = q3 - q1
         k = settings.OUTLIER_IQR_MULTIPLIER
 
@@ -164,30 +227,39 @@ def collect_outlier_rows_iqr(df: pd.DataFrame) -> List[Dict[str, Any]]:
         upper = q3 + k * iqr
 
         mask = (s < lower) | (s > upper)
-        outlier_idx = df.index[mask.fillna(False)]
-
-        for idx in outlier_idx:
-            if idx not in rows_by_index:
-                row_dict = df.loc[idx].to_dict()
-                row_dict["row_index"] = int(idx) if isinstance(idx, int) else idx
-                row_dict["issues"] = []
-                rows_by_index[idx] = row_dict
-
-            rows_by_index[idx]["issues"].append(f"outlier:{col}")
+        for idx in df.index[mask.fillna(False)]:
+            issues_by_index.setdefault(idx, []).append(f"outlier:{col}")
 
     # 보기 좋게 row_index 기준 정렬 (정수 인덱스일 때)
-    rows = list(rows_by_index.values())
+    indices = list(issues_by_index)
     try:
-        rows.sort(key=lambda x: x.get("row_index", 0))
+        indices.sort()
     except Exception:
         pass
 
-    return rows
+    return _issue_frame(
+        df.loc[indices],
+        issues=[issues_by_index[idx] for idx in indices],
+    )
+
+
+# 비즈니스 룰 라벨 (issues에 기록되는 순서)
+BUSINESS_RULE_LABELS = (
+    "quantity <= 0",
+    "unit_price <= 0",
+    "amount <= 0",
+    "amount != quantity * unit_price",
+    "invalid_date_format",
+    "non_base_date",
+)
+
 
 def collect_business_rule_rows(
     df: pd.DataFrame,
     file_dt: Optional[datetime] = None,
-) -> List[Dict[str, Any]]:
+    numeric_cache: Optional[Dict[str, pd.Series]] = None,
+    datetime_cache: Optional[Dict[str, pd.Series]] = None,
+) -> pd.DataFrame:
     """
     ✅ 비즈니스 룰 위반 행만 반환 (여기에 날짜/금액 무결성까지 포함)
 
@@ -198,55 +270,48 @@ def collect_business_rule_rows(
     - amount != quantity * unit_price
     - order_date 파싱 실패 -> invalid_date_format
     - (file_dt가 주어지면) order_date != 기준일 -> non_base_date
-    """
-    rows: List[Dict[str, Any]] = []
-
-    qty = pd.to_numeric(df.get("quantity"), errors="coerce") if "quantity" in df.columns else pd.Series([pd.NA] * len(df))
-    price = pd.to_numeric(df.get("unit_price"), errors="coerce") if "unit_price" in df.columns else pd.Series([pd.NA] * len(df))
-    amount = pd.to_numeric(df.get("amount"), errors="coerce") if "amount" in df.columns else pd.Series([pd.NA] * len(df))
 
-    base_date = file_dt.date() if file_dt is not None else None
-
-    parsed_date = None
+    규칙별 boolean mask를 한 번에 계산하고, 위반 행에 대해서만 issues를 조립한다.
+    """
+    qty = _numeric_column(df, "quantity", numeric_cache)
+    price = _numeric_column(df, "unit_price", numeric_cache)
+    amount = _numeric_column(df, "amount", numeric_cache)
+
+    # 1) 0/음수 규칙
+    m_qty = qty.le(0)
+    m_price = price.le(0)
+    m_amount = amount.le(0)
+
+    # 2) 금액 무결성
+    m_mismatch = qty.notna() & price.notna() & amount.notna() & amount.ne(qty * price)
+
+    # 3) 날짜 규칙(기준일 불일치만 필요)
+    no_flag = pd.Series(False, index=df.index)
+    m_bad_date = no_flag
+    m_non_base = no_flag
     if "order_date" in df.columns:
-        parsed_date = pd.to_datetime(df["order_date"].astype(str), errors="coerce", infer_datetime_format=True)
-
-    for idx, row in df.iterrows():
-        issues: List[str] = []
-
-        q = qty.loc[idx] if idx in qty.index else pd.NA
-        p = price.loc[idx] if idx in price.index else pd.NA
-        a = amount.loc[idx] if idx in amount.index else pd.NA
-
-        # 1) 0/음수 규칙
-        if pd.notna(q) and q <= 0:
-            issues.append("quantity <= 0")
-        if pd.notna(p) and p <= 0:
-            issues.append("unit_price <= 0")
-        if pd.notna(a) and a <= 0:
-            issues.append("amount <= 0")
-
-        # 2) 금액 무결성
-        if pd.notna(q) and pd.notna(p) and pd.notna(a):
-            if a != q * p:
-                issues.append("amount != quantity * unit_price")
-
-        # 3) 날짜 규칙(기준일 불일치만 필요)
-        if parsed_date is not None:
-            d = parsed_date.loc[idx]
-            if pd.isna(d):
-                issues.append("invalid_date_format")
-            else:
-                if base_date is not None and d.date() != base_date:
-                    issues.append("non_base_date")
-
-        if issues:
-            row_dict = row.to_dict()
-            row_dict["row_index"] = int(idx) if isinstance(idx, int) else idx
-            row_dict["issues"] = issues
-            rows.append(row_dict)
-
-    return rows
+        parsed_date = _datetime_column(df, "order_date", datetime_cache)
+        m_bad_date = parsed_date.isna()
+        if file_dt is not None:
+            # 기준일 [00:00, 다음날 00:00) 범위 비교 -> 날짜 변환(.dt.date/normalize) 없이 한 번에 판정
+            day_start = pd.Timestamp(file_dt.date())
+            tz = getattr(parsed_date.dtype, "tz", None)
+            if tz is not None:
+                day_start = day_start.tz_localize(tz)
+            day_end = day_start + pd.Timedelta(days=1)
+            m_non_base = parsed_date.lt(day_start) | parsed_date.ge(day_end)
+
+    flags = np.column_stack([
+        m.to_numpy(dtype=bool)
+        for m in (m_qty, m_price, m_amount, m_mismatch, m_bad_date, m_non_base)
+    ])
+    has_issue = flags.any(axis=1)
+    labels = np.array(BUSINESS_RULE_LABELS, dtype=object)
+
+    return _issue_frame(
+        df[has_issue],
+        issues=[labels[row_flags].tolist() for row_flags in flags[has_issue]],
+    )
 
 
 def run_quality_checks(df: pd.DataFrame, dt: Optional[datetime] = None) -> QualityReport:
@@ -257,14 +322,31 @@ def run_quality_checks(df: pd.DataFrame, dt: Optional[datetime] = None) -> Quali
     - 이상치(IQR)
     - 비즈니스 룰 위반 (날짜/금액 무결성 포함)
     """
+    # 숫자/날짜 변환은 여기서 한 번만 수행하고 각 검사에 전달
+    numeric_cache = {
+        col: pd.to_numeric(df[col], errors="coerce")
+        for col in settings.NUMERIC_COLUMNS
+        if col in df.columns
+    }
+    datetime_cache = {
+        col: _parse_datetime(df[col])
+        for col in settings.DATETIME_COLUMNS
+        if col in df.columns
+    }
+
     missing = check_missing(df)
-    outlier = check_outliers_iqr(df)
+    outlier = check_outliers_iqr(df, numeric_cache=numeric_cache)
 
     row_issues = {
         "missing": collect_missing_rows(df),
         "duplicates": collect_duplicate_rows(df),
-        "outliers": collect_outlier_rows_iqr(df),
-        "business_rule": collect_business_rule_rows(df, file_dt=dt),
+        "outliers": collect_outlier_rows_iqr(df, numeric_cache=numeric_cache),
+        "business_rule": collect_business_rule_rows(
+            df,
+            file_dt=dt,
+            numeric_cache=numeric_cache,
+            datetime_cache=datetime_cache,
+        ),
     }
 
     return QualityReport(
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from pathlib import Path
 from datetime import datetime
-import json
+from functools import lru_cache
+from html import escape
+import re
+import threading
 import markdown
+import pandas as pd
 
 from .quality import QualityReport
+from .serialization import dumps_json
 from . import settings
 
 try:
@@ -14,8 +19,20 @@ except ImportError:
     generate_ai_summary = None  # AI 리포트 생성 기능이 없는 경우
 
 
+# 이미 만든 디렉터리는 다시 mkdir 하지 않음 (실행 중 삭제되면 쓰기 단계에서 에러가 남)
+_ensured_dirs: set[Path] = set()
+
+
 def ensure_dir(path: Path) -> None:
+    if path in _ensured_dirs:
+        return
     path.mkdir(parents=True, exist_ok=True)
+    _ensured_dirs.add(path)
+
+
+def _report_path(file_date: str, ext: str) -> Path:
+    """리포트 파일 경로 (quality_report_YYYY_MM_DD.<ext>)."""
+    return settings.REPORT_DIR / f"quality_report_{file_date}.{ext}"
 
 
 def save_json_report(report: QualityReport, dt: datetime | None = None) -> Path:
@@ -23,83 +40,132 @@ def save_json_report(report: QualityReport, dt: datetime | None = None) -> Path:
         dt = datetime.today()
 
     ensure_dir(settings.REPORT_DIR)
-    file_name = f"quality_report_{dt.strftime('%Y_%m_%d')}.json"
-    file_path = settings.REPORT_DIR / file_name
+    file_path = _report_path(dt.strftime("%Y_%m_%d"), "json")
 
-    with file_path.open("w", encoding="utf-8") as f:
-        json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+    file_path.write_bytes(dumps_json(report.to_dict(), indent=settings.JSON_REPORT_INDENT))
 
     return file_path
 
 
+# 표 컬럼 순서 (여기 없는 컬럼은 이름순으로 뒤에 붙음)
+_PREFERRED = (
+    "row_index",
+    "order_id",
+    "order_date",
+    "customer_id",
+    "product_id",
+    "quantity",
+    "unit_price",
+    "amount",
+    "issues",
+)
+_PREFERRED_SET = frozenset(_PREFERRED)
+
+# 표에 따로 표시하지 않는 메타 키
+_META_KEYS = frozenset({"missing_columns"})
+
+# 빈 섹션은 키 계산 없이 바로 이 문자열을 반환
+_NO_ROWS_MD = "- (해당 없음)"
+_NO_ROWS_HTML = "<ul>\n<li>(해당 없음)</li>\n</ul>"
+
+_EMPTY = frozenset()
+
+
+def _row_missing(r: dict) -> frozenset:
+    # 이미 set이면 그대로, 비어 있으면 새 set을 만들지 않음
+    mc = r.get("missing_columns")
+    if isinstance(mc, (set, frozenset)):
+        return mc
+    return frozenset(mc) if mc else _EMPTY
+
+
+@lru_cache(maxsize=16)
+def _sep_line(n: int) -> str:
+    """markdown 표 구분선 (컬럼 수별로 캐시)."""
+    return "| " + " | ".join(["---"] * n) + " |"
+
+
+def _head_records(rows, max_rows: int) -> tuple[list[dict], int]:
+    """row_issues(DataFrame 또는 list[dict]) -> (표에 표시할 상위 row dict 목록, 전체 건수)"""
+    if isinstance(rows, pd.DataFrame):
+        # 표에 보이는 행만 dict로 변환
+        return rows.head(max_rows).to_dict(orient="records"), len(rows)
+    return rows[:max_rows], len(rows)
+
+
+def _issue_counts(report: QualityReport) -> tuple[int, int, int, int]:
+    """(결측, 중복, 이상치, 룰 위반) 건수."""
+    row_issues = report.row_issues or {}
+    missing_cnt = sum(report.missing.missing_by_column.values()) if report.missing else 0
+    dup_cnt = len(row_issues.get("duplicates", ()))
+    outlier_cnt = sum(report.outlier.outlier_count_by_column.values()) if report.outlier else 0
+    br_cnt = len(row_issues.get("business_rule", ()))
+    return missing_cnt, dup_cnt, outlier_cnt, br_cnt
+
+
+def _table_keys(rows_to_show) -> list[str]:
+    """표에 표시할 컬럼 순서 (_PREFERRED 우선, 나머지는 이름순, 메타 키 제외)."""
+    all_keys = set().union(*(r.keys() for r in rows_to_show))
+    extra = sorted(k for k in all_keys if k not in _PREFERRED_SET and k not in _META_KEYS)
+    return [k for k in _PREFERRED if k in all_keys] + extra
+
+
+def _issues_str(issues) -> str:
+    if isinstance(issues, list):
+        return ", ".join(str(x) for x in issues)
+    return str(issues) if issues else ""
+
+
+def _row_cells(r: dict, keys: list[str], highlight_missing: bool) -> list[tuple[str, bool]]:
+    """
+    row dict -> [(셀 문자열, 결측 강조 여부)] (markdown/HTML 표 공통)
+    - issues 컬럼은 ", "로 이어 붙이고 강조하지 않음
+    """
+    row_missing = _row_missing(r) if highlight_missing else _EMPTY
+    cells = []
+    for k in keys:
+        if k == "issues":
+            cells.append((_issues_str(r.get("issues")), False))
+        else:
+            val = r.get(k, "")
+            cells.append((val if type(val) is str else str(val), k in row_missing))
+    return cells
+
+
+def _status(counts: tuple[int, ...]) -> str:
+    return "⚠️ 이슈 발견" if any(counts) else "✅ 이상 없음"
+
+
 def _make_table_from_rows(rows, highlight_missing: bool = False, max_rows: int = 20) -> str:
     """
-    row_issues rows(list[dict]) -> markdown table
+    row_issues rows(DataFrame 또는 list[dict]) -> markdown table
     - highlight_missing=True면 missing_columns에 포함된 컬럼을 **굵게**
     - max_rows: 표 길이 제한
     """
-    if not rows:
-        return "- (해당 없음)"
-
-    rows_to_show = rows[:max_rows]
-    hidden = len(rows) - len(rows_to_show)
-
-    preferred = [
-        "row_index",
-        "order_id",
-        "order_date",
-        "customer_id",
-        "product_id",
-        "quantity",
-        "unit_price",
-        "amount",
-        "issues",
-    ]
+    if rows is None or len(rows) == 0:
+        return _NO_ROWS_MD
 
-    meta_keys = {"missing_columns"}
-    all_keys = set()
-    for r in rows_to_show:
-        all_keys.update(r.keys())
+    rows_to_show, total = _head_records(rows, max_rows)
+    hidden = total - len(rows_to_show)
 
-    keys = [k for k in preferred if k in all_keys]
-    for k in sorted(all_keys):
-        if k not in keys and k not in meta_keys:
-            keys.append(k)
+    keys = _table_keys(rows_to_show)
 
-    header = "| " + " | ".join(keys) + " |"
-    sep = "| " + " | ".join(["---"] * len(keys)) + " |"
-    lines = [header, sep]
+    # 표 전체를 하나의 리스트에 조각으로 쌓고 마지막에 한 번만 join
+    out = ["| ", " | ".join(keys), " |\n", _sep_line(len(keys))]
 
     for r in rows_to_show:
-        row_missing = set(r.get("missing_columns", [])) if highlight_missing else set()
-        issues_list = r.get("issues", [])
-        issues_str = (
-            ", ".join(str(x) for x in issues_list)
-            if isinstance(issues_list, list)
-            else (str(issues_list) if issues_list else "")
-        )
-
-        cells = []
-        for k in keys:
-            if k == "issues":
-                val = issues_str
-            else:
-                val = r.get(k, "")
-                if highlight_missing and k in row_missing:
-                    val = f"**{val}**"
-            cells.append(str(val))
-
-        lines.append("| " + " | ".join(cells) + " |")
-
-    table = "\n".join(lines)
+        cells = _row_cells(r, keys, highlight_missing)
+        out.append("\n| ")
+        out.append(" | ".join(f"**{val}**" if miss else val for val, miss in cells))
+        out.append(" |")
 
     if hidden > 0:
-        table += (
+        out.append(
             f"\n\n- (표에는 상위 {len(rows_to_show)}건만 표시했습니다. "
             f"나머지 {hidden}건은 JSON에서 확인하세요.)"
         )
 
-    return table
+    return "".join(out)
 
 
 def _make_kv_table(rows: dict, key_name: str = "항목", value_name: str = "값") -> str:
@@ -108,7 +174,7 @@ def _make_kv_table(rows: dict, key_name: str = "항목", value_name: str = "값"
     예) {"quantity": 2, "amount": 1} -> 표
     """
     if not rows:
-        return "- (해당 없음)"
+        return _NO_ROWS_MD
 
     lines = [f"| {key_name} | {value_name} |", "| --- | --- |"]
     for k, v in rows.items():
@@ -116,11 +182,19 @@ def _make_kv_table(rows: dict, key_name: str = "항목", value_name: str = "값"
     return "\n".join(lines)
 
 
-def generate_markdown_from_report(report: QualityReport, dt: datetime | None = None) -> str:
-    if dt is None:
-        dt = datetime.today()
-
-    title_date = dt.strftime("%Y-%m-%d")
+def generate_markdown_from_report(
+    report: QualityReport,
+    dt: datetime | None = None,
+    title_date: str | None = None,
+) -> str:
+    """
+    - report 필드를 직접 읽음 (to_dict()는 JSON 저장에만 사용)
+    - title_date: 호출 측에서 미리 만든 제목용 날짜 문자열(YYYY-MM-DD)
+    """
+    if title_date is None:
+        if dt is None:
+            dt = datetime.today()
+        title_date = dt.strftime("%Y-%m-%d")
 
     if not report.has_file:
         return f"""# 데이터 품질 리포트 - {title_date}
@@ -130,136 +204,248 @@ def generate_markdown_from_report(report: QualityReport, dt: datetime | None = N
 - 메시지: {report.message}
 """
 
-    data = report.to_dict()
-    missing = data.get("missing", {}) or {}
-    outlier = data.get("outlier", {}) or {}
-    row_issues = data.get("row_issues", {}) or {}
+    row_issues = report.row_issues or {}
 
     # ===== 카운트 (4개) =====
-    missing_cnt = sum((missing.get("missing_by_column", {}) or {}).values())
-    dup_cnt = len(row_issues.get("duplicates", []) or [])
-    br_cnt = len(row_issues.get("business_rule", []) or [])
-    outlier_cnt = sum((outlier.get("outlier_count_by_column", {}) or {}).values())
-
-    has_issue = any([missing_cnt, dup_cnt, outlier_cnt, br_cnt])
-    status = "⚠️ 이슈 발견" if has_issue else "✅ 이상 없음"
+    counts = _issue_counts(report)
+    missing_cnt, dup_cnt, outlier_cnt, br_cnt = counts
+    status = _status(counts)
 
     # ===== 표 (4개) =====
     missing_rows_md = _make_table_from_rows(
-        row_issues.get("missing", []) or [],
+        row_issues.get("missing"),
         highlight_missing=True,
     )
-    dup_rows_md = _make_table_from_rows(row_issues.get("duplicates", []) or [])
-    business_rule_rows_md = _make_table_from_rows(row_issues.get("business_rule", []) or [])
+    dup_rows_md = _make_table_from_rows(row_issues.get("duplicates"))
+    business_rule_rows_md = _make_table_from_rows(row_issues.get("business_rule"))
+    outlier_rows_md = _make_table_from_rows(row_issues.get("outliers"))
+
+    # 큰 표 문자열을 f-string으로 한 번 더 복사하지 않도록 조각을 모아 한 번만 join
+    parts = [
+        f"# 데이터 품질 리포트 - {title_date}\n\n",
+        "## 상태 요약\n",
+        f"- 상태: {status}\n",
+        f"- 메시지: {report.message}\n",
+        f"- 이슈 개요: 결측 **{missing_cnt}** / 중복 **{dup_cnt}** / 이상치 **{outlier_cnt}** / 룰 위반 **{br_cnt}**\n",
+        "\n---\n\n## 결측\n(굵게 표시된 값은 결측 컬럼입니다.)\n\n",
+        missing_rows_md,
+        "\n\n---\n\n## 중복\n",
+        dup_rows_md,
+        "\n\n---\n\n## 이상치\n",
+        outlier_rows_md,
+        "\n\n---\n\n## 룰 위반\n",
+        business_rule_rows_md,
+        "\n",
+    ]
+    return "".join(parts)
 
-    # 이상치는 "컬럼별 이상치 개수"를 표로
-    outlier_counts = outlier.get("outlier_count_by_column", {}) or {}
-    outlier_table_data = {k: f"{v}건" for k, v in outlier_counts.items()} if outlier_counts else {}
-    outlier_rows_md = _make_table_from_rows(row_issues.get("outliers", []))
 
-    md = f"""# 데이터 품질 리포트 - {title_date}
+def _make_html_table_from_rows(rows, highlight_missing: bool = False, max_rows: int = 20) -> str:
+    """
+    row_issues rows(DataFrame 또는 list[dict]) -> HTML table (_make_table_from_rows와 같은 컬럼 순서/표시 규칙)
+    - 가로 스크롤용 table-wrap 래퍼까지 바로 출력
+    """
+    if rows is None or len(rows) == 0:
+        return _NO_ROWS_HTML
 
-## 상태 요약
-- 상태: {status}
-- 메시지: {report.message}
-- 이슈 개요: 결측 **{missing_cnt}** / 중복 **{dup_cnt}** / 이상치 **{outlier_cnt}** / 룰 위반 **{br_cnt}**
+    rows_to_show, total = _head_records(rows, max_rows)
+    hidden = total - len(rows_to_show)
+    keys = _table_keys(rows_to_show)
 
----
+    out = ['<div class="table-wrap"><table>\n<thead>\n<tr>']
+    out.extend(f"<th>{escape(str(k))}</th>" for k in keys)
+    out.append("</tr>\n</thead>\n<tbody>")
 
-## 결측
-(굵게 표시된 값은 결측 컬럼입니다.)
+    for r in rows_to_show:
+        out.append("\n<tr>")
+        for val, miss in _row_cells(r, keys, highlight_missing):
+            val = escape(val)
+            out.append(f"<td><strong>{val}</strong></td>" if miss else f"<td>{val}</td>")
+        out.append("</tr>")
 
-{missing_rows_md}
+    out.append("\n</tbody>\n</table></div>")
 
----
+    if hidden > 0:
+        out.append(
+            f"\n<ul>\n<li>(표에는 상위 {len(rows_to_show)}건만 표시했습니다. "
+            f"나머지 {hidden}건은 JSON에서 확인하세요.)</li>\n</ul>"
+        )
 
-## 중복
-{dup_rows_md}
+    return "".join(out)
 
----
 
-## 이상치
-{outlier_rows_md}
+def generate_html_from_report(
+    report: QualityReport,
+    dt: datetime | None = None,
+    title_date: str | None = None,
+) -> str:
+    """
+    generate_markdown_from_report와 같은 구성을 Markdown 파싱 없이 HTML(body)로 바로 생성
+    - title_date: generate_markdown_from_report와 동일
+    """
+    if title_date is None:
+        if dt is None:
+            dt = datetime.today()
+        title_date = dt.strftime("%Y-%m-%d")
+    message = escape(report.message)
 
----
+    if not report.has_file:
+        return (
+            f"<h1>데이터 품질 리포트 - {title_date}</h1>\n"
+            "<h2>상태 요약</h2>\n"
+            f"<ul>\n<li>❌ 파일 없음</li>\n<li>메시지: {message}</li>\n</ul>"
+        )
 
-## 룰 위반
-{business_rule_rows_md}
-"""
-    return md
+    row_issues = report.row_issues or {}
+    counts = _issue_counts(report)
+    missing_cnt, dup_cnt, outlier_cnt, br_cnt = counts
+    status = _status(counts)
+
+    parts = [
+        f"<h1>데이터 품질 리포트 - {title_date}</h1>\n",
+        "<h2>상태 요약</h2>\n<ul>\n",
+        f"<li>상태: {status}</li>\n",
+        f"<li>메시지: {message}</li>\n",
+        f"<li>이슈 개요: 결측 <strong>{missing_cnt}</strong> / 중복 <strong>{dup_cnt}</strong> / "
+        f"이상치 <strong>{outlier_cnt}</strong> / 룰 위반 <strong>{br_cnt}</strong></li>\n",
+        "</ul>\n<hr />\n",
+        "<h2>결측</h2>\n<p>(굵게 표시된 값은 결측 컬럼입니다.)</p>\n",
+        _make_html_table_from_rows(row_issues.get("missing"), highlight_missing=True),
+        "\n<hr />\n<h2>중복</h2>\n",
+        _make_html_table_from_rows(row_issues.get("duplicates")),
+        "\n<hr />\n<h2>이상치</h2>\n",
+        _make_html_table_from_rows(row_issues.get("outliers")),
+        "\n<hr />\n<h2>룰 위반</h2>\n",
+        _make_html_table_from_rows(row_issues.get("business_rule")),
+    ]
+    return "".join(parts)
 
 
-def save_markdown_report(report: QualityReport, dt: datetime | None = None) -> Path:
+# Markdown 리포트에서 AI 요약 섹션이 시작되는 위치
+_AI_SECTION_HEADER = "\n\n---\n\n## AI 요약\n\n"
+# 요약을 하나도 받지 못하고 실패한 경우 (헤더 없이 실패 문구만)
+_AI_FAILURE_PREFIX = "\n\n---\n\n"
+
+
+def save_markdown_report(
+    report: QualityReport,
+    dt: datetime | None = None,
+    ai_summary: str | None = None,
+) -> Path:
+    """
+    Markdown 리포트 저장
+    - ai_summary가 주어지면(배치로 미리 생성한 경우) 그대로 붙이고 API는 호출하지 않음
+    """
     if dt is None:
         dt = datetime.today()
 
     ensure_dir(settings.REPORT_DIR)
-    file_name = f"quality_report_{dt.strftime('%Y_%m_%d')}.md"
-    file_path = settings.REPORT_DIR / file_name
-
-    md = generate_markdown_from_report(report, dt=dt)
-
-    # AI 요약 리포트 추가
-    if (
-        settings.ENABLE_AI_REPORT
-        and settings.OPENAI_API_KEY
-        and generate_ai_summary is not None
-    ):
-        try:
-            ai_md = generate_ai_summary(report)
+    file_path = _report_path(dt.strftime("%Y_%m_%d"), "md")
+    _write_markdown(file_path, report, dt.strftime("%Y-%m-%d"), ai_summary)
+    return file_path
 
-            # AI가 ## 요약 같은 헤더를 만들면 문서가 커져보일 수 있어,
-            # 필요하면 여기서 헤더 레벨을 낮추는 후처리를 넣어도 됨.
-            md += "\n\n---\n\n## AI 요약\n\n" + ai_md + "\n"
-        except Exception as e:
-            md += f"\n\n---\n\n**[AI 요약 생성 실패]**: {e}\n"
 
+def _write_markdown(
+    file_path: Path,
+    report: QualityReport,
+    title_date: str,
+    ai_summary: str | None = None,
+    ai_error: str | None = None,
+) -> str:
+    """Markdown 리포트 기록 (AI 요약은 본문 뒤에 이어서 기록). HTML에 쓸 AI 요약 섹션 Markdown을 반환."""
     with file_path.open("w", encoding="utf-8") as f:
-        f.write(md)
-
-    return file_path
+        f.write(generate_markdown_from_report(report, title_date=title_date))
+        # AI 요약 리포트 추가
+        return _write_ai_section(f.write, report, ai_summary, ai_error)
 
 
-def save_html_from_md(md_path: Path, html_path: Path) -> Path:
-    md_text = md_path.read_text(encoding="utf-8")
+def _ai_failure_line(error) -> str:
+    return f"**[AI 요약 생성 실패]**: {error}\n"
 
-    html_body = markdown.markdown(
-        md_text,
-        extensions=["extra", "toc", "sane_lists"],
-    )
 
-    # 테이블이 긴 경우 가로 스크롤을 쉽게 하기 위해 래핑
-    html_body = html_body.replace("<table>", '<div class="table-wrap"><table>')
-    html_body = html_body.replace("</table>", "</table></div>")
-
-    html = f"""<!doctype html>
+def _write_ai_section(
+    write,
+    report: QualityReport,
+    ai_summary: str | None = None,
+    ai_error: str | None = None,
+) -> str:
+    """
+    AI 요약 섹션 Markdown을 write로 기록하고 기록한 내용을 반환 (AI 리포트가 꺼져 있으면 "")
+    - ai_summary가 주어지면(배치/동시 실행으로 미리 생성한 경우) 그대로 쓰고 API는 호출하지 않음
+    - ai_error가 주어지면(미리 요청했다가 실패한 경우) 실패 문구만 쓰고 API는 다시 호출하지 않음
+    - 아니면 스트리밍으로 받아 도착하는 대로 기록
+    - 요약을 하나도 받기 전에 실패하면 헤더 없이 실패 문구만 기록
+    """
+    if ai_summary is not None:
+        section = _AI_SECTION_HEADER + ai_summary + "\n"
+        write(section)
+        return section
+    if ai_error is not None:
+        section = _AI_FAILURE_PREFIX + _ai_failure_line(ai_error)
+        write(section)
+        return section
+
+    if not (
+        settings.ENABLE_AI_REPORT
+        and settings.get_openai_api_key()
+        and generate_ai_summary is not None
+    ):
+        return ""
+
+    parts: list[str] = []
+
+    def write_part(text: str) -> None:
+        if not parts:
+            # 헤더는 첫 조각이 도착했을 때 기록
+            write(_AI_SECTION_HEADER)
+            parts.append(_AI_SECTION_HEADER)
+        write(text)
+        parts.append(text)
+
+    try:
+        generate_ai_summary(report, write_cb=write_part)
+        write_part("\n")
+    except Exception as e:
+        failure = _ai_failure_line(e)
+        if parts:
+            write_part("\n\n" + failure)
+        else:
+            write(_AI_FAILURE_PREFIX + failure)
+            parts.append(_AI_FAILURE_PREFIX + failure)
+    return "".join(parts)
+
+
+# HTML 문서 골격 (CSS 포함 고정 텍스트는 import 시 한 번만 생성)
+_HTML_PREFIX_BEFORE_TITLE = """<!doctype html>
 <html lang="ko">
 <head>
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width, initial-scale=1">
-<title>{md_path.stem}</title>
+<title>"""
+
+_HTML_PREFIX_AFTER_TITLE = """</title>
 <style>
-:root {{
+:root {
   --border: #e5e7eb;
-}}
+}
 
-body {{
+body {
   max-width: 1100px;
   margin: 32px auto;
   padding: 0 16px;
   font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial;
   line-height: 1.65;
   color: #111827;
-}}
+}
 
-h1 {{ font-size: 26px; margin: 0 0 12px; }}
-h2 {{ font-size: 18px; margin: 22px 0 10px; padding-top: 8px; border-top: 1px solid var(--border); }}
-h3 {{ font-size: 16px; margin: 18px 0 8px; }}
+h1 { font-size: 26px; margin: 0 0 12px; }
+h2 { font-size: 18px; margin: 22px 0 10px; padding-top: 8px; border-top: 1px solid var(--border); }
+h3 { font-size: 16px; margin: 18px 0 8px; }
 
-hr {{ border: 0; border-top: 1px solid var(--border); margin: 18px 0; }}
+hr { border: 0; border-top: 1px solid var(--border); margin: 18px 0; }
 
-.table-wrap {{ overflow-x: auto; }}
-table {{
+.table-wrap { overflow-x: auto; }
+table {
   width: 100%;
   min-width: 900px;
   border-collapse: separate;
@@ -268,43 +454,153 @@ table {{
   border: 1px solid var(--border);
   border-radius: 10px;
   overflow: hidden;
-}}
+}
 
-th, td {{
+th, td {
   padding: 10px 12px;
   border-bottom: 1px solid var(--border);
   vertical-align: top;
   font-size: 14px;
-}}
+}
 
-th {{
+th {
   background: #f3f4f6;
   position: sticky;
   top: 0;
   z-index: 1;
-}}
+}
 
-tbody tr:nth-child(even) td {{ background: #fcfcfd; }}
+tbody tr:nth-child(even) td { background: #fcfcfd; }
 
-td {{ word-break: break-word; }}
+td { word-break: break-word; }
 
-pre {{
+pre {
   padding: 12px;
   overflow: auto;
   background: #f6f8fa;
   border-radius: 10px;
   border: 1px solid var(--border);
-}}
+}
 
-code {{
+code {
   font-family: ui-monospace, Menlo, Consolas, monospace;
-}}
+}
 </style>
 </head>
 <body>
-{html_body}
+"""
+
+_HTML_SUFFIX = """
 </body>
 </html>
 """
-    html_path.write_text(html, encoding="utf-8")
+
+
+_md_local = threading.local()
+
+_TABLE_RE = re.compile(r"<(/?)table>")
+
+
+def _wrap_table_tag(m: re.Match) -> str:
+    return "</table></div>" if m.group(1) else '<div class="table-wrap"><table>'
+
+
+def _markdown_to_html(md_text: str) -> str:
+    """
+    Markdown -> HTML
+    - markdown.Markdown 인스턴스(확장 로딩/정규식 컴파일)는 스레드별로 한 번만 만들고 reset() 후 재사용
+    """
+    md = getattr(_md_local, "md", None)
+    if md is None:
+        md = markdown.Markdown(extensions=["extra", "toc", "sane_lists"])
+        _md_local.md = md
+    return md.reset().convert(md_text)
+
+
+def save_html_from_md(
+    md_path: Path,
+    html_path: Path,
+    report: QualityReport | None = None,
+    dt: datetime | None = None,
+    md_text: str | None = None,
+) -> Path:
+    """
+    Markdown 리포트 -> HTML
+    - report가 주어지면 본문은 generate_html_from_report로 바로 만들고,
+      Markdown 파싱은 뒤에 붙은 AI 요약 섹션에만 적용
+    - report가 없으면 기존처럼 Markdown 전체를 파싱
+    """
+    if md_text is None:
+        md_text = md_path.read_text(encoding="utf-8")
+
+    if report is not None:
+        _, found, ai_md = md_text.partition(_AI_SECTION_HEADER)
+        html_body = _render_html_body(report, found + ai_md, dt=dt)
+    else:
+        # 테이블이 긴 경우 가로 스크롤을 쉽게 하기 위해 래핑 (여닫는 태그를 한 번에 치환)
+        html_body = _TABLE_RE.sub(_wrap_table_tag, _markdown_to_html(md_text))
+
+    _write_html(html_path, md_path.stem, html_body)
     return html_path
+
+
+def _render_html_body(
+    report: QualityReport,
+    ai_section: str = "",
+    dt: datetime | None = None,
+    title_date: str | None = None,
+) -> str:
+    """리포트 HTML 본문 + AI 요약 섹션(_write_ai_section이 기록한 Markdown). Markdown 파싱은 AI 요약에만 적용."""
+    html_body = generate_html_from_report(report, dt=dt, title_date=title_date)
+    if not ai_section:
+        return html_body
+
+    _, found, ai_md = ai_section.partition(_AI_SECTION_HEADER)
+    if found:
+        return html_body + "\n<hr />\n<h2>AI 요약</h2>\n" + _markdown_to_html(ai_md)
+    # 헤더 없는 실패 문구 (구분선 + 굵은 글씨)
+    return html_body + "\n" + _markdown_to_html(ai_section)
+
+
+def _write_html(html_path: Path, title: str, html_body: str) -> None:
+    # 전체 문서를 한 문자열로 합치지 않고 조각별로 바로 기록 (본문 사본 1개 절약)
+    with html_path.open("w", encoding="utf-8", buffering=1 << 16) as f:
+        f.write(_HTML_PREFIX_BEFORE_TITLE)
+        f.write(title)
+        f.write(_HTML_PREFIX_AFTER_TITLE)
+        f.write(html_body)
+        f.write(_HTML_SUFFIX)
+
+
+def save_all_reports(
+    report: QualityReport,
+    dt: datetime | None = None,
+    ai_summary: str | None = None,
+    ai_error: str | None = None,
+) -> list[Path]:
+    """
+    JSON + Markdown + HTML(파일이 있는 경우) 리포트를 한 번에 저장
+    - AI 요약은 도착하는 대로 Markdown 파일에 기록하고, 같은 내용으로 HTML을 마지막에 생성
+    - ai_summary/ai_error: 호출 측에서 미리 요청한 AI 요약 결과 (_write_ai_section 참고)
+    """
+    # 날짜는 여기서 한 번만 확정 (자정 직전 실행 시 파일별로 날짜가 달라지는 문제 방지)
+    if dt is None:
+        dt = datetime.today()
+    file_date = dt.strftime("%Y_%m_%d")
+    title_date = dt.strftime("%Y-%m-%d")
+
+    ensure_dir(settings.REPORT_DIR)
+    json_path = _report_path(file_date, "json")
+    md_path = _report_path(file_date, "md")
+
+    # to_dict()는 JSON에만 사용 (Markdown/HTML은 report 필드를 직접 읽음)
+    json_path.write_bytes(dumps_json(report.to_dict(), indent=settings.JSON_REPORT_INDENT))
+    ai_section = _write_markdown(md_path, report, title_date, ai_summary, ai_error)
+    paths = [json_path, md_path]
+
+    if report.has_file:
+        html_path = _report_path(file_date, "html")
+        _write_html(html_path, html_path.stem, _render_html_body(report, ai_section, title_date=title_date))
+        paths.append(html_path)
+
+    return paths
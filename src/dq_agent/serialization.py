@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import math
+from datetime import date, datetime, time
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # orjson이 없으면 표준 json 사용
+
+_ISO_TYPES = (datetime, date, time)
+
+
+def dumps_json(obj: Any, indent: bool = False) -> bytes:
+    """
+    dict -> UTF-8 JSON bytes
+    - orjson이 있으면 사용 (표준 json 대비 수 배 빠름)
+    - 어느 경로든 같은 바이트 (NaN은 null, 날짜는 isoformat)
+    - indent=True면 2칸 들여쓰기 (파일 저장용), False면 공백 없는 압축 형태 (LLM 프롬프트용)
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str)
+
+    obj = _to_builtin(obj)
+    if indent:
+        text = json.dumps(obj, ensure_ascii=False, indent=2, allow_nan=False, default=str)
+    else:
+        text = json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False, default=str
+        )
+    return text.encode("utf-8")
+
+
+def _to_builtin(obj: Any) -> Any:
+    """
+    표준 json 경로에서 orjson과 같은 바이트가 나오도록 정리
+    - NaN/inf -> None (null), numpy -> 파이썬 기본형, 날짜/시간 -> isoformat
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {_to_key(k): _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(v) for v in obj]
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return _to_builtin(obj.tolist())
+    if type(obj) in _ISO_TYPES:  # orjson처럼 하위 클래스(pd.Timestamp 등)는 default=str
+        return obj.isoformat()
+    return obj
+
+
+def _to_key(key: Any) -> Any:
+    if type(key) in _ISO_TYPES:
+        return key.isoformat()
+    if isinstance(key, np.generic):
+        return key.item()
+    return key
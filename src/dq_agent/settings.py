@@ -1,4 +1,5 @@
 # src/dq_agent/settings.py
+import functools
 import os
 from pathlib import Path
 from datetime import datetime
@@ -7,8 +8,12 @@ from dotenv import load_dotenv
 # 루트 경로 기준으로 상대 경로 처리
 BASE_DIR = Path(__file__).resolve().parents[2]
 
-# .env 로드
-load_dotenv(BASE_DIR / ".env")
+
+@functools.cache
+def _load_env_once() -> None:
+    """.env 로드 (import 시점이 아니라 환경변수 값이 처음 필요할 때 한 번만)."""
+    load_dotenv(BASE_DIR / ".env")
+
 
 DATA_DIR = BASE_DIR / "data"
 REPORT_DIR = BASE_DIR / "reports"
@@ -31,6 +36,9 @@ DATETIME_COLUMNS = [
     "order_date",
 ]
 
+# 날짜 컬럼 포맷 (파싱 실패가 절반을 넘으면 ISO8601로 재시도)
+DATE_FORMAT = "%Y-%m-%d"
+
 # 👉 숫자형 컬럼 (비즈니스 룰 / 이상치 검사 대상)
 NUMERIC_COLUMNS = [
     "quantity",
@@ -57,6 +65,35 @@ def get_today_file_path(dt: datetime | None = None) -> Path:
 
 
 # === OpenAI 관련 설정 ===
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
-ENABLE_AI_REPORT = os.getenv("ENABLE_AI_REPORT", "false").lower() == "true"
+# AI 요약 캐시 디렉터리 (REPORT_DIR 아래, REPORT_DIR를 바꾸면 캐시도 따라가도록 사용 시점에 경로 계산)
+AI_CACHE_DIR_NAME = ".ai_cache"
+
+
+def get_openai_api_key() -> str | None:
+    _load_env_once()
+    return os.getenv("OPENAI_API_KEY")
+
+
+# === 환경변수(.env) 기반 설정 ===
+# settings.XXX 로 처음 접근할 때 .env를 로드해서 계산하고 모듈에 저장
+_ENV_SETTINGS = {
+    "OPENAI_MODEL": lambda: os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
+    "ENABLE_AI_REPORT": lambda: os.getenv("ENABLE_AI_REPORT", "false").lower() == "true",
+    # 여러 날짜 동시 실행 시 AI 요청 동시성 상한 (RPM/TPM 한도에 맞춰 조정)
+    "AI_MAX_CONCURRENCY": lambda: int(os.getenv("DQ_AI_CONCURRENCY", "8")),
+    # AI 요약 캐시 (DQ_AI_CACHE=0 이면 매번 새로 호출)
+    "ENABLE_AI_CACHE": lambda: os.getenv("DQ_AI_CACHE", "1") != "0",
+    # AI 요약 캐시 최대 개수 (넘으면 가장 오래 사용하지 않은 것부터 삭제)
+    "AI_CACHE_MAX_ENTRIES": lambda: int(os.getenv("DQ_AI_CACHE_MAX", "500")),
+    # JSON 리포트 들여쓰기 (기계만 읽는다면 DQ_JSON_INDENT=false로 압축 저장)
+    "JSON_REPORT_INDENT": lambda: os.getenv("DQ_JSON_INDENT", "true").lower() == "true",
+}
+
+
+def __getattr__(name: str):
+    if name not in _ENV_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    _load_env_once()
+    value = _ENV_SETTINGS[name]()
+    globals()[name] = value
+    return value